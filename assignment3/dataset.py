@@ -1,9 +1,111 @@
+import copy
+import functools
+import os
+
+import numpy as np
 import torch
-from torch.utils.data import Dataset
+from torch.nn.utils.rnn import pad_sequence
+from torch.utils.data import Dataset, IterableDataset
 
 from datasets import load_dataset
 from transformers import AutoTokenizer
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+
+@njit(cache=True)
+def _filter_overlaps(starts, ends):
+    """
+    Greedily keeps the entities that don't overlap with any previously kept entity.
+
+    Args:
+        starts (np.ndarray): The start character offsets of the entities (int64).
+        ends (np.ndarray): The end character offsets of the entities (int64).
+
+    Returns:
+        np.ndarray: A boolean mask of the kept entities.
+    """
+    n = len(starts)
+    keep = np.zeros(n, dtype=np.bool_)
+    kept = np.empty(n, dtype=np.int64)
+    n_kept = 0
+    for i in range(n):
+        overlaps = False
+        for k in range(n_kept):
+            j = kept[k]
+            if starts[i] <= ends[j] and starts[j] <= ends[i]:
+                overlaps = True
+                break
+        if not overlaps:
+            keep[i] = True
+            kept[n_kept] = i
+            n_kept += 1
+    return keep
+
+
+@functools.lru_cache(maxsize=1)
+def _load_tags(path):
+    """
+    Reads the entity types from the file and assigns IOBES tag IDs to them.
+
+    The result is cached, so it is shared by all the datasets built from the same file.
+
+    Args:
+        path (str): The path to the file with one entity type per line.
+
+    Returns:
+        tuple: A dictionary mapping tag names to IDs, a list mapping IDs to tag names
+            and a dictionary mapping entity types to their indices.
+
+    Raises:
+        ValueError: If there are more entity types than the int8 tag IDs can hold.
+    """
+    with open(path, 'r') as f:
+        tags = f.read().split('\n')
+    tags2id = dict()
+
+    for i, tag in enumerate(tags):
+        tags2id['S-' + tag] = 4 * i + 1
+        tags2id['B-' + tag] = 4 * i + 2
+        tags2id['I-' + tag] = 4 * i + 3
+        tags2id['E-' + tag] = 4 * i + 4
+    tags2id['O'] = 0
+
+    # the tag IDs are cached as int8
+    if len(tags2id) > np.iinfo(np.int8).max + 1:
+        raise ValueError(f"{len(tags)} entity types give tag IDs that don't fit in int8, at most 31 are supported")
+
+    # the IDs are dense, so the inverse mapping is a plain list
+    id2tags = [None] * len(tags2id)
+    for tag, i in tags2id.items():
+        id2tags[i] = tag
+
+    type2idx = {tag: i for i, tag in enumerate(tags)}
+
+    return tags2id, id2tags, type2idx
+
+
+@functools.lru_cache(maxsize=4)
+def _load_tokenizer(name):
+    """
+    Loads the tokenizer from the Hugging Face model hub, once per name.
+
+    Args:
+        name (str): The name of the tokenizer.
+
+    Returns:
+        transformers.PreTrainedTokenizer: The loaded tokenizer.
+    """
+    return AutoTokenizer.from_pretrained(name)
+
+
 class NERDataset(Dataset):
     """
     A PyTorch dataset class for Named Entity Recognition (NER) task.
@@ -17,24 +119,35 @@ class NERDataset(Dataset):
         return_all (bool, optional): Whether to return all information in the dataset or only a subset. 
             Defaults to False.
 
+    Use `StreamingNERDataset` to read the split lazily instead of loading and encoding it upfront.
+
     Attributes:
+        streaming (bool): Whether the split is streamed instead of loaded and cached, False for this class.
         dataset_link (str): The link to the dataset.
         dataset (datasets.Dataset): The loaded dataset.
         tokenizer (transformers.PreTrainedTokenizer): The tokenizer used for tokenization.
         tags2id (dict): A dictionary mapping tag names to their corresponding IDs.
-        id2tags (dict): A dictionary mapping tag IDs to their corresponding names.
+        id2tags (list): A list mapping tag IDs to their corresponding names.
+        _type2idx (dict): A dictionary mapping entity types to their indices in 'ner_tags.txt'.
 
     Methods:
         __len__(): Returns the length of the dataset.
         __getitem__(index): Returns a specific item from the dataset.
+        _build_cache(): Encodes every sample of the dataset once.
+        _tokenize(texts): Tokenizes a batch of texts.
+        _encode(row, encoded, index): Converts a tokenized sample and its annotations to tag IDs.
         _truncate_output(sample): Truncates the input and output sequences to the maximum length.
-        _convert_to_iobes(tags): Converts the tags from IOB format to IOBES format.
+        _convert_to_iobes(types): Converts the token-level entity types to IOBES tag IDs.
         convert_ids_to_tags(ids): Converts tag IDs to their corresponding tag names.
-        _overlap(a, b): Checks if two character offsets overlap.
         parse_annotations(annotations, sort=True): Parses the annotation data and removes overlapping entities.
         convert_to_token_level(tokens, offsets, special_tokens, annotation): Converts character offsets to token-level annotations.
     """
 
+    streaming = False
+
+    # the names of the additional information returned with `return_all`
+    _extra_keys = ('text', 'tokens', 'special_tokens_mask', 'offsets')
+
     def __init__(self, tokenizer="DeepPavlov/rubert-base-cased", mode='train', max_length=128, return_all=False):
         self.mode = mode
         self.max_length = max_length
@@ -42,28 +155,25 @@ class NERDataset(Dataset):
 
         # get the dataset
         self.dataset_link = 'iluvvatar/RuNNE'
-        self.dataset = load_dataset(self.dataset_link, trust_remote_code=True)
-        self.dataset = self.dataset[mode]
+        if self.streaming:
+            self.dataset = load_dataset(self.dataset_link, split=mode, streaming=True, trust_remote_code=True)
+        else:
+            self.dataset = load_dataset(self.dataset_link, trust_remote_code=True)
+            self.dataset = self.dataset[mode]
 
         # get the tokenizer
-        if type(tokenizer) is str:
-            self.tokenizer = AutoTokenizer.from_pretrained(tokenizer)
+        if isinstance(tokenizer, str):
+            self.tokenizer = _load_tokenizer(tokenizer)
         else:
             self.tokenizer = tokenizer
+        self._sep_id = self.tokenizer.sep_token_id
 
         # get the tags from the 'ner_tags.txt' and assign them id
-        with open('ner_tags.txt', 'r') as f:
-            tags = f.read().split('\n')
-        self.tags2id = dict()
-
-        for i, tag in enumerate(tags):
-            self.tags2id['S-' + tag] = 4 * i + 1
-            self.tags2id['B-' + tag] = 4 * i + 2
-            self.tags2id['I-' + tag] = 4 * i + 3
-            self.tags2id['E-' + tag] = 4 * i + 4
-        self.tags2id['O'] = 0
+        self.tags2id, self.id2tags, self._type2idx = _load_tags('ner_tags.txt')
 
-        self.id2tags = {v: k for k, v in self.tags2id.items()}
+        # the text and annotations never change, so encode every sample once
+        if not self.streaming:
+            self._build_cache()
 
     def __len__(self):
         """
@@ -82,110 +192,140 @@ class NERDataset(Dataset):
             index (int): The index of the item to retrieve.
 
         Returns:
-            tuple: A tuple containing the input and output sequences.
+            dict: A dictionary with the 'input_ids', 'token_type_ids' and (if not in dev mode) 'labels' tensors,
+                plus the 'text', 'tokens', 'special_tokens_mask' and 'offsets' if `return_all` is set.
+                Everything is a copy of the cached sample, so it can be modified in place.
+        """
+        # hand out copies, so that e.g. masking the labels in place doesn't corrupt the cache
+        return {
+            key: value.clone() if isinstance(value, torch.Tensor) else copy.copy(value)
+            for key, value in self._cache[index].items()
+        }
+
+    def _build_cache(self):
+        """
+        Encodes and truncates every sample of the dataset once and stores the result in `self._cache`.
+        """
+        # tokenize the whole split in a single batched call
+        encoded = self._tokenize(list(self.dataset['text']))
+
+        self._cache = [
+            self._truncate_output(self._encode(row, encoded, index)) for index, row in enumerate(self.dataset)
+        ]
+
+    def _tokenize(self, texts):
+        """
+        Tokenizes a batch of texts.
+
+        Args:
+            texts (list): A list of texts.
+
+        Returns:
+            transformers.BatchEncoding: The tokenized texts with their offsets and special tokens mask.
+        """
+        return self.tokenizer(
+            texts,
+            return_offsets_mapping=True,
+            return_special_tokens_mask=True,
+        )
+
+    def _encode(self, row, encoded, index):
+        """
+        Converts a tokenized sample and its annotations to tag IDs.
+
+        Args:
+            row (dict): The sample from the dataset.
+            encoded (transformers.BatchEncoding): The tokenized texts of a batch containing the sample.
+            index (int): The index of the sample in `encoded`.
+
+        Returns:
+            tuple: A tuple containing the full (not truncated) input and output sequences.
         """
         # get the text
-        text = self.dataset['text'][index]
-        t = self.tokenizer(text, return_offsets_mapping=True, return_special_tokens_mask=True)
+        text = row['text']
+        input_ids = np.asarray(encoded['input_ids'][index], dtype=np.int32)
         
-        token_type_ids = t['token_type_ids']
-        tokens = self.tokenizer.convert_ids_to_tokens(t['input_ids'])
-        offsets, special_tokens_mask = t['offset_mapping'], t['special_tokens_mask']
+        token_type_ids = np.asarray(encoded['token_type_ids'][index], dtype=np.int8)
+        # the tokens are only returned with `return_all`, so don't convert them otherwise
+        tokens = self.tokenizer.convert_ids_to_tokens(encoded['input_ids'][index]) if self.return_all else None
+        offsets = encoded['offset_mapping'][index]
+        special_tokens_mask = encoded['special_tokens_mask'][index]
         if self.mode == 'dev':
-            return self._truncate_output((
-                t['input_ids'],
+            return (
+                input_ids,
                 token_type_ids,
                 text,
                 tokens,
                 special_tokens_mask,
                 offsets,
-            ))
+            )
 
         # if it's train mode then extract the entities
-        annotations = self.dataset['entities'][index]
+        annotations = row['entities']
         parsed_annotations, _ = self.parse_annotations(annotations, sort=True)
-        token_level_tags = self.convert_to_token_level(tokens, offsets, special_tokens_mask, parsed_annotations)
+        tags_ids = self.convert_to_token_level(input_ids, offsets, special_tokens_mask, parsed_annotations)
 
-        # convert token_level tags to its corresponding id
-        tags_ids = [self.tags2id[t] for t in token_level_tags]
-
-        return self._truncate_output((
-            t['input_ids'],
+        return (
+            input_ids,
             token_type_ids,
             tags_ids,
             text,
             tokens,
             special_tokens_mask,
             offsets
-        ))
+        )
     
     def _truncate_output(self, sample):
         """
-        Truncates the input and output sequences to the maximum length.
+        Truncates the input and output sequences to the maximum length and converts them to tensors.
+
+        The tensors keep the compact types of the encoded sequences (int32 input IDs, int8 token
+        type and tag IDs), `collate_batch` converts them to int64 batches.
 
         Args:
             sample (tuple): A tuple containing the input and output sequences.
 
         Returns:
-            tuple: A tuple containing the truncated input and output sequences.
+            dict: A dictionary containing the truncated input and output sequences.
         """
-        input_ids, token_type_ids = sample[:2]
-        input_ids = input_ids[:self.max_length] # input_ids
-        token_type_ids = token_type_ids[:self.max_length] # token_type_ids
-        
-        sep_token = self.tokenizer.convert_tokens_to_ids("[SEP]")
-        if input_ids[-1] != sep_token:
-            input_ids[-1] = sep_token
-        
-        if not self.return_all:
-            [() for e in sample[:2 + (self.mode != 'dev')]] # remove all other info
-
-        if self.mode == 'dev':
-            res = [input_ids, token_type_ids]
-            if not self.return_all:
-                return res
-            res.extend(sample[2:])
-            return res
-
-        tags_ids = sample[2]
-        tags_ids = tags_ids[:self.max_length]
-        
-        res = [input_ids, token_type_ids, tags_ids]
-        if not self.return_all:
-            return res
-        
-        res.extend(sample[3:])
+        n_sequences = 2 + (self.mode != 'dev')
+        sequences = []
+        for sequence in sample[:n_sequences]:
+            sequence = torch.from_numpy(sequence)
+            if len(sequence) > self.max_length:
+                # copy the truncated sequence, so the whole one can be freed
+                sequence = sequence[:self.max_length].clone()
+            sequences.append(sequence)
+
+        input_ids = sequences[0]
+        if input_ids[-1] != self._sep_id:
+            input_ids[-1] = self._sep_id
+
+        res = dict(zip(('input_ids', 'token_type_ids', 'labels'), sequences))
+        if self.return_all:
+            res.update(zip(self._extra_keys, sample[n_sequences:]))
         return res
 
-    def _convert_to_iobes(self, tags):
+    def _convert_to_iobes(self, types):
         """
-        Converts the tags from IOB format to IOBES format.
+        Converts the token-level entity types to IOBES format and returns their IDs.
 
         Args:
-            tags (list): A list of tags in IOB format.
+            types (np.ndarray): The entity type index + 1 of every token, 0 for tokens outside of entities.
 
         Returns:
-            list: A list of tags in IOBES format.
+            np.ndarray: The IOBES tag IDs (int8).
         """
-        iobes_tags = []
-        length = len(tags)
-
-        for i, tag in enumerate(tags):
-            if tag == 'O':
-                iobes_tags.append(tag)
-            else:
-                if i == 0 or tags[i-1] != tag:
-                    if i+1 == length or tags[i+1] != tag:
-                        iobes_tags.append('S-' + tag)
-                    else:
-                        iobes_tags.append('B-' + tag)
-                else:
-                    if i+1 == length or tags[i+1] != tag:
-                        iobes_tags.append('E-' + tag)
-                    else:
-                        iobes_tags.append('I-' + tag)
-
-        return iobes_tags
+        prev_types = np.concatenate(([-1], types[:-1]))
+        next_types = np.concatenate((types[1:], [-1]))
+        is_start = types != prev_types
+        is_end = types != next_types
+
+        # position inside the entity: 1 - S, 2 - B, 3 - I, 4 - E
+        position = np.where(is_start, np.where(is_end, 1, 2), np.where(is_end, 4, 3))
+        iobes_ids = np.where(types == 0, 0, 4 * (types - 1) + position)
+
+        return iobes_ids.astype(np.int8)
     
     def convert_ids_to_tags(self, ids):
         """
@@ -197,23 +337,10 @@ class NERDataset(Dataset):
         Returns:
             list: A list of tag names.
         """
-        return [self.id2tags.get(i, 'O') for i in ids]
-
-    def _overlap(self, a, b):
-        """
-        Checks if two character offsets overlap.
-
-        Args:
-            a (tuple): The first character offset.
-            b (tuple): The second character offset.
-
-        Returns:
-            bool: True if the character offsets overlap, False otherwise.
-        """
-        if a[0] <= b[0] <= a[1] or b[0] <= a[0] <= b[1]:
-            return True
-        return False
-    
+        if isinstance(ids, torch.Tensor):
+            ids = ids.tolist()
+        n_tags = len(self.id2tags)
+        return [self.id2tags[i] if 0 <= i < n_tags else 'O' for i in ids]
 
     def parse_annotations(self, annotations, sort=True):
         """
@@ -226,18 +353,27 @@ class NERDataset(Dataset):
         Returns:
             tuple: A tuple containing the filtered annotations and the original annotations.
         """
-        parsed_annotations = []
-        for annotation in annotations:
-            start, end, entity_type = annotation.split()
-            parsed_annotations.append((int(start), int(end), entity_type))
-
-        parsed_annotations = sorted(parsed_annotations, key=lambda x: x[1] - x[0])
-
-        filtered_annotations = []
-        for annotation in parsed_annotations: # remove overlapping entities
-            overlaps = sum([self._overlap(annotation, j) for j in filtered_annotations])
-            if overlaps == 0:
-                filtered_annotations.append(annotation)
+        parts = [annotation.split() for annotation in annotations]
+        starts = np.fromiter((int(p[0]) for p in parts), dtype=np.int64, count=len(parts))
+        ends = np.fromiter((int(p[1]) for p in parts), dtype=np.int64, count=len(parts))
+        entity_types = [p[2] for p in parts]
+
+        # sort by length, the stable sort keeps equally long entities in their original order
+        order = np.argsort(ends - starts, kind='stable')
+        starts, ends = starts[order], ends[order]
+        parsed_annotations = [
+            (start, end, entity_types[i]) for start, end, i in zip(starts.tolist(), ends.tolist(), order.tolist())
+        ]
+
+        if NUMBA_AVAILABLE: # remove overlapping entities
+            keep = _filter_overlaps(starts, ends)
+            filtered_annotations = [a for a, k in zip(parsed_annotations, keep.tolist()) if k]
+        else:
+            filtered_annotations = []
+            for annotation in parsed_annotations: # remove overlapping entities
+                start, end = annotation[0], annotation[1]
+                if not any(start <= j[1] and j[0] <= end for j in filtered_annotations):
+                    filtered_annotations.append(annotation)
 
         if sort:
             filtered_annotations = sorted(filtered_annotations, key=lambda x: x[0])    
@@ -249,94 +385,141 @@ class NERDataset(Dataset):
         Converts character offsets to token-level annotations.
 
         Args:
-            tokens (list): A list of tokens.
+            tokens (list): A list of tokens or token IDs, only their number is used.
             offsets (list): A list of character offsets.
             special_tokens (list): A list indicating whether each token is a special token.
             annotation (tuple): A tuple containing the start and end character offsets and the entity type.
 
         Returns:
-            list: A list of token-level annotations.
+            np.ndarray: The token-level IOBES tag IDs (int8).
         """
-        token_level_annotations = ["O"] * len(tokens)
+        # entity type index + 1 of every token, 0 stands for 'O'
+        token_level_types = np.zeros(len(tokens), dtype=np.int64)
+
+        # map the character offsets of regular tokens to their positions
+        start_map, end_map = dict(), dict()
+        for i, (special_token, (start_offset, end_offset)) in enumerate(zip(special_tokens, offsets)):
+            if special_token == 1:
+                continue
+            start_map.setdefault(start_offset, i)
+            end_map.setdefault(end_offset, i)
 
         # Iterate through annotations and align with tokenized text
         for start, end, entity_type in annotation:
-            start_token_idx, end_token_idx = None, None
-            for i, (special_token, (start_offset, end_offset)) in enumerate(zip(special_tokens, offsets)):
-                if special_token == 1:
-                    continue
-                if start_offset == start:
-                    start_token_idx = i
-                if end_offset == end:
-                    end_token_idx = i
-                    break
+            start_token_idx, end_token_idx = start_map.get(start), end_map.get(end)
             
             # If start_token_idx and end_token_idx are found, assign entity_type to corresponding tokens
-            if start_token_idx is not None and end_token_idx is not None:
-                for i in range(start_token_idx, end_token_idx + 1):
-                    token_level_annotations[i] = entity_type
+            if start_token_idx is not None and end_token_idx is not None and start_token_idx <= end_token_idx:
+                token_level_types[start_token_idx:end_token_idx + 1] = self._type2idx[entity_type] + 1
         
-        assert len(tokens) == len(token_level_annotations)
-        
-        token_level_annotations_iobes = self._convert_to_iobes(token_level_annotations)
-        assert len(token_level_annotations) == len(token_level_annotations_iobes)
+        tags_ids = self._convert_to_iobes(token_level_types)
+        assert len(tokens) == len(tags_ids)
 
-        return token_level_annotations_iobes
+        return tags_ids
     
 
+class StreamingNERDataset(NERDataset, IterableDataset):
+    """
+    An iterable version of `NERDataset` that reads the split lazily. It takes the same arguments as `NERDataset`.
+
+    The samples are tokenized in chunks while iterating instead of being cached upfront. With several
+    DataLoader workers, the shards of the streamed split are distributed between them by `datasets`.
+
+    Attributes:
+        streaming (bool): True, the split is streamed.
+        chunk_size (int): The number of texts tokenized in a single batched call.
+
+    Methods:
+        __iter__(): Yields the samples of the dataset.
+        _encode_rows(rows): Encodes a chunk of samples.
+    """
+
+    streaming = True
+    chunk_size = 1000
+
+    def __len__(self):
+        raise TypeError("A streaming dataset has no length")
+
+    def __getitem__(self, index):
+        raise TypeError("A streaming dataset can't be indexed, iterate over it instead")
+
+    def __iter__(self):
+        """
+        Yields the samples of the dataset.
+
+        Yields:
+            dict: A dictionary with the input and output sequences, see `NERDataset.__getitem__`.
+        """
+        rows = []
+        for row in self.dataset:
+            rows.append(row)
+            if len(rows) == self.chunk_size:
+                yield from self._encode_rows(rows)
+                rows = []
+        if rows:
+            yield from self._encode_rows(rows)
+
+    def _encode_rows(self, rows):
+        """
+        Encodes a chunk of samples.
+
+        Args:
+            rows (list): A list of samples from the dataset.
+
+        Yields:
+            dict: A dictionary with the input and output sequences, see `NERDataset.__getitem__`.
+        """
+        encoded = self._tokenize([row['text'] for row in rows])
+        for index, row in enumerate(rows):
+            yield self._truncate_output(self._encode(row, encoded, index))
+
+
 def collate_batch(batch):
     """
-    Collates a batch of samples into a batch tensor.
+    Collates a batch of samples into a batch of padded int64 tensors.
 
     Args:
-        batch (list): A list of samples.
+        batch (list): A list of samples (dictionaries).
 
     Returns:
-        list: A list of batch tensors.
-    """
-    max_length = max(len(x[0]) for x in batch)
-    
-    input_ids_list = []
-    token_type_ids_list = []
-    tags_ids_list = []
-    for sample in batch:
-        input_ids = sample[0]
-        token_type_ids = sample[1]
-        
-        input_ids += [0] * (max_length - len(input_ids))
-        token_type_ids += [0] * (max_length - len(token_type_ids))
+        dict: A dictionary with a padded batch tensor for every tensor of the samples
+            ('input_ids', 'token_type_ids' and, if present, 'labels').
 
-        input_ids_list.append(torch.LongTensor(input_ids))
-        token_type_ids_list.append(torch.LongTensor(token_type_ids))
+    Example:
+        The samples are cached, so the workers only index and collate them. Persistent
+        workers keep the dataset copies alive between epochs:
 
-        if len(sample) == 3:
-            tags_ids = sample[2]
-            tags_ids += [0] * (max_length - len(tags_ids))
-            tags_ids_list.append(torch.LongTensor(tags_ids))
-    
-    output = [
-        torch.stack(input_ids_list, dim=0),
-        torch.stack(token_type_ids_list, dim=0),
-    ]
-    if len(tags_ids_list) > 0:
-        output.append(torch.stack(tags_ids_list, dim=0))
-
-    return output
+            DataLoader(dataset, batch_size=32, collate_fn=collate_batch,
+                       num_workers=min(8, os.cpu_count()), persistent_workers=True,
+                       pin_memory=torch.cuda.is_available(), prefetch_factor=4)
+    """
+    return {
+        key: pad_sequence([sample[key] for sample in batch], batch_first=True, padding_value=0).long()
+        for key, value in batch[0].items()
+        if isinstance(value, torch.Tensor)
+    }
     
 
 if __name__ == '__main__':
     dataset = NERDataset(mode='train', max_length=256)
     sample = dataset[10]
     print('sample:', sample)
-    print('length:', [len(i) for i in sample])
+    print('length:', {k: len(v) for k, v in sample.items()})
 
     from torch.utils.data import DataLoader
-    dataloader = DataLoader(dataset, batch_size=8, collate_fn=collate_batch)
+    loader_kwargs = dict(
+        batch_size=32,
+        collate_fn=collate_batch,
+        num_workers=min(8, os.cpu_count() or 1),
+        persistent_workers=True,
+        pin_memory=torch.cuda.is_available(),
+        prefetch_factor=4,
+    )
+    dataloader = DataLoader(dataset, **loader_kwargs)
     for batch in dataloader:
-        input_ids, token_type_ids, tags_ids = batch
-        print('input_ids.shape:', input_ids.shape)
-        print('token_type_ids.shape:', token_type_ids.shape)
-        print('tags_ids.shape:', tags_ids.shape)
+        print('input_ids.shape:', batch['input_ids'].shape)
+        print('token_type_ids.shape:', batch['token_type_ids'].shape)
+        print('labels.shape:', batch['labels'].shape)
         break
 
     print('='*50)
@@ -344,21 +527,20 @@ if __name__ == '__main__':
     dataset = NERDataset(mode='dev')
     sample = dataset[10]
     print('sample:', sample)
-    print('length:', [len(i) for i in sample])
+    print('length:', {k: len(v) for k, v in sample.items()})
 
-    dataloader = DataLoader(dataset, batch_size=8, collate_fn=collate_batch)
+    dataloader = DataLoader(dataset, **loader_kwargs)
     for batch in dataloader:
-        input_ids, token_type_ids = batch
-        print('input_ids.shape:', input_ids.shape)
-        print('token_type_ids.shape:', token_type_ids.shape)
+        print('input_ids.shape:', batch['input_ids'].shape)
+        print('token_type_ids.shape:', batch['token_type_ids'].shape)
         break
 
     print('='*50)
     dataset = NERDataset(mode='train', max_length=32, return_all=True)
     sample = dataset[10]
     print('sample:', sample)
-    print('tags:', dataset.convert_ids_to_tags(sample[2]))
-    print('length:', [len(i) for i in sample])
+    print('tags:', dataset.convert_ids_to_tags(sample['labels']))
+    print('length:', {k: len(v) for k, v in sample.items()})
 
 
     
\ No newline at end of file